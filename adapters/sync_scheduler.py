@@ -5,16 +5,53 @@ Makes intelligent decisions about when to sync data
 """
 
 import time
+import heapq
+import logging
+import asyncio
+import inspect
 import threading
-import json
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Callable
-from queue import Queue, PriorityQueue
-import hashlib
+from collections import defaultdict, deque
+from itertools import count, repeat
+from dataclasses import dataclass, replace
+from typing import Awaitable, Dict, List, Optional, Callable, Union
+import numpy as np
 
 from network_monitor import NetworkMonitor, NetworkCondition
 
-@dataclass
+log = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+except ImportError:  # Run the kernels as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+@njit(cache=True, fastmath=True)
+def _score_kernel(latency_ms, bandwidth_mbps, packet_loss, w_lat, w_bw):
+    """Network quality score (0-100) from raw measurements"""
+    latency_score = max(0.0, 100.0 - (latency_ms / 5.0))
+    bandwidth_score = min(100.0, bandwidth_mbps * 10.0)
+    loss_score = max(0.0, 100.0 - (packet_loss * 10.0))
+    
+    return latency_score * w_lat + bandwidth_score * w_bw + loss_score * 0.3
+
+@njit(cache=True, fastmath=True)
+def _delay_kernel(data_size, priority, quality_score, base_delay, min_interval, max_delay):
+    """Sync delay in seconds, clamped to [min_interval, max_delay]"""
+    quality_factor = (100.0 - quality_score) / 100.0
+    size_factor = min(data_size / (1024.0 * 1024.0), 5.0)  # Max 5x for 1MB+
+    priority_factor = (11 - priority) / 10.0
+    
+    delay = base_delay * quality_factor * size_factor * priority_factor
+    
+    return min(max(delay, min_interval), max_delay)
+
+_NS_PER_S = 1_000_000_000
+
+# Network quality buckets, used as rows of the decision LUT
+POOR_NETWORK, AVERAGE_NETWORK, GOOD_NETWORK = range(3)
+
+@dataclass(slots=True, frozen=True)
 class SyncEvent:
     """Represents a data synchronization event"""
     data_id: str
@@ -24,12 +61,8 @@ class SyncEvent:
     source_node: str
     app_type: str = "generic"  # Type of application data
     consistency_level: str = "eventual"  # eventual, strong, causal
-    
-    def __lt__(self, other):
-        """For priority queue ordering"""
-        return self.priority > other.priority  # Higher priority first
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SyncResult:
     """Result of a sync operation"""
     event: SyncEvent
@@ -38,101 +71,290 @@ class SyncResult:
     success: bool
     error_msg: Optional[str] = None
 
+class _Shard:
+    """
+    One partition of the pending queue, drained by its own sync thread
+    Events for a data_id always land in the same shard, so their order
+    is kept without any cross-shard locking
+    """
+    
+    def __init__(self, index: int):
+        self.index = index
+        # Pending events as a heap of [-priority, seq, event, valid] entries;
+        # the unique seq breaks ties FIFO so events are never compared.
+        # bisect.insort on a list is no faster for small queues and its inserts
+        # degrade to O(n) once a burst backs the queue up; SortedList stays
+        # O(log n) but has higher constants than heapq at every size
+        self._heap = []
+        self._lock = threading.Lock()
+        self._seq = count()
+        
+        # Live heap entry per data_id; superseded entries are marked invalid
+        # and skipped when popped
+        self._entry_map = {}
+        
+        # Set whenever an event is queued (or on stop) to wake the sync thread
+        self.wakeup = threading.Event()
+        
+        # Delayed events as a heap of [ready_ns, seq, event, valid] entries,
+        # with the live entry per data_id so newer updates supersede them too
+        self._delay_heap = []
+        self._delayed_map = {}
+        self.thread = None
+        
+    def add(self, event: SyncEvent) -> SyncEvent:
+        """
+        Queue an event, coalescing it with any pending or delayed event for
+        the same data_id into one that keeps the newer data and the higher
+        priority; returns the event that was kept
+        """
+        with self._lock:
+            event = self._push(event)
+            
+        self.wakeup.set()
+        return event
+        
+    def _push(self, event: SyncEvent) -> SyncEvent:
+        """Queue an event for syncing; the caller holds the lock"""
+        stale = self._entry_map.get(event.data_id)
+        if stale is None:
+            stale = self._delayed_map.pop(event.data_id, None)
+            
+        if stale is not None:
+            stale[3] = False  # Superseded; skipped when popped
+            priority = max(event.priority, stale[2].priority)
+            if stale[2].timestamp > event.timestamp:
+                event = stale[2]  # Keep the newer data
+            if event.priority != priority:
+                event = replace(event, priority=priority)
+                
+        entry = [-event.priority, next(self._seq), event, True]
+        self._entry_map[event.data_id] = entry
+        heapq.heappush(self._heap, entry)
+        return event
+        
+    def drain_batch(self, n: int) -> List[SyncEvent]:
+        """Pop up to n highest-priority events under a single lock acquire"""
+        batch = []
+        with self._lock:
+            while self._heap and len(batch) < n:
+                _, _, event, valid = heapq.heappop(self._heap)
+                if valid:
+                    del self._entry_map[event.data_id]
+                    batch.append(event)
+                    
+        return batch
+        
+    def size(self) -> int:
+        """Number of events waiting in this shard"""
+        with self._lock:
+            return len(self._entry_map)
+            
+    def delay(self, event: SyncEvent, ready_ns: int):
+        """
+        Hold an event back until the monotonic time ready_ns
+        If a newer update for its data_id was queued meanwhile, the two are
+        coalesced and queued now instead
+        """
+        with self._lock:
+            if event.data_id in self._entry_map:
+                self._push(event)
+                return
+                
+            entry = [ready_ns, next(self._seq), event, True]
+            self._delayed_map[event.data_id] = entry
+            heapq.heappush(self._delay_heap, entry)
+            
+    def release_delayed(self, now_ns: int):
+        """Queue delayed events whose delay has elapsed"""
+        with self._lock:
+            while self._delay_heap and self._delay_heap[0][0] <= now_ns:
+                _, _, event, valid = heapq.heappop(self._delay_heap)
+                if valid:
+                    del self._delayed_map[event.data_id]
+                    self._push(event)
+                    
+    def next_ready_ns(self) -> Optional[int]:
+        """Monotonic time the earliest delayed event is due, if any"""
+        with self._lock:
+            return self._delay_heap[0][0] if self._delay_heap else None
+
 class AdaptiveSyncScheduler:
     """
     Core adaptive synchronization scheduler
+    Events are partitioned by data_id across num_shards independent sync threads
     TODO: Add ML-based prediction models
     """
     
-    def __init__(self, node_id: str = "edge_node"):
+    # Indices into adaptive_weights
+    W_LAT, W_BW, W_PRIO, W_SIZE = range(4)
+    
+    def __init__(self, node_id: str = "edge_node", num_shards: int = 1):
         self.node_id = node_id
-        self.sync_queue = PriorityQueue()
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        self._workers = [_Shard(i) for i in range(num_shards)]
+        
         self.network_monitor = NetworkMonitor()
-        self.sync_history = []
         self.running = False
-        self.sync_thread = None
         self.sync_callback = None  # Custom sync function
         
+        # Monotonic time of the last sync start or finish on any shard
+        self._last_sync_ns = 0
+        self._sync_gate = threading.Lock()
+        
+        # Event loop that runs a batch's syncs concurrently, on its own thread
+        self._loop = None
+        self._loop_thread = None
+        
         # Adaptive parameters
-        self.min_sync_interval = 1.0  # Minimum seconds between syncs
-        self.max_sync_delay = 300.0   # Maximum delay in seconds
-        self.batch_threshold = 5      # Number of events to batch together
+        self.min_sync_interval = 1.0   # Minimum seconds between syncs, across all shards
+        self.max_sync_delay = 300.0    # Maximum delay in seconds
+        self.batch_threshold = 5       # Number of events to batch together
+        self.network_cache_ttl = 0.25  # Seconds a network reading is reused
+        self._lut = self._build_decision_lut()
         
         # Learning parameters
         self.success_rate_window = 50
-        self.adaptive_weights = {
-            'latency': 0.4,
-            'bandwidth': 0.3,
-            'priority': 0.2,
-            'size': 0.1
-        }
         
-    def set_sync_callback(self, callback: Callable[[SyncEvent, NetworkCondition], SyncResult]):
-        """Set custom sync execution function"""
+        # Results within the success rate window, with running totals
+        self.sync_history = deque(maxlen=self.success_rate_window)
+        self._success_count = 0
+        self._duration_sum = 0.0
+        self._priority_sum = 0
+        
+        # Weights indexed by W_LAT, W_BW, W_PRIO, W_SIZE
+        self.adaptive_weights = np.array([0.4, 0.3, 0.2, 0.1])
+        self._sync_weight_cache()
+        
+    def _sync_weight_cache(self):
+        """Mirror the weights used by _score_kernel as plain floats"""
+        self._w_lat = float(self.adaptive_weights[self.W_LAT])
+        self._w_bw = float(self.adaptive_weights[self.W_BW])
+        
+    def set_sync_callback(self, callback: Callable[[SyncEvent, NetworkCondition],
+                                                   Union[SyncResult, Awaitable[SyncResult]]]):
+        """
+        Set custom sync execution function
+        Coroutine functions are awaited on the scheduler's event loop;
+        plain functions run in its default executor, and an awaitable
+        they return is then awaited on the loop
+        """
         self.sync_callback = callback
         
-    def should_sync_now(self, event: SyncEvent, network: NetworkCondition) -> bool:
+    def _build_decision_lut(self) -> np.ndarray:
+        """
+        Precompute should-sync for every (network bucket, priority) pair,
+        priorities clamped to 0-10; strong consistency is applied on top
+        """
+        priorities = np.arange(11)
+        lut = np.zeros((3, 11), dtype=np.bool_)
+        
+        lut[POOR_NETWORK] = priorities >= 8
+        lut[AVERAGE_NETWORK] = priorities >= 6
+        lut[GOOD_NETWORK] = priorities >= 4
+        lut[:, 9:] = True  # Always sync critical events
+        
+        return lut
+        
+    def _network_bucket(self, quality_score: float) -> int:
+        """Map a network quality score onto a decision LUT row"""
+        if quality_score < 30:
+            return POOR_NETWORK
+        elif quality_score < 60:
+            return AVERAGE_NETWORK
+        else:
+            return GOOD_NETWORK
+            
+    def should_sync_now(self, event: SyncEvent, network: NetworkCondition,
+                        quality_score: Optional[float] = None) -> bool:
         """
         Core decision algorithm: should we sync this event now?
+        Pass a precomputed quality_score to skip rescoring the network
         TODO: Replace with ML model
         """
         
-        # Always sync critical events
-        if event.priority >= 9:
-            return True
-            
         # Strong consistency requires immediate sync
         if event.consistency_level == "strong":
             return True
             
         # Network quality threshold
-        quality_score = self._calculate_network_score(network)
-        
-        if quality_score < 30:  # Poor network
-            return event.priority >= 8
-        elif quality_score < 60:  # Average network
-            return event.priority >= 6
-        else:  # Good network
-            return event.priority >= 4
-            
-    def calculate_sync_delay(self, event: SyncEvent, network: NetworkCondition) -> float:
+        if quality_score is None:
+            quality_score = self._calculate_network_score(network)
+        bucket = self._network_bucket(quality_score)
+        
+        return bool(self._lut[bucket, min(max(event.priority, 0), 10)])
+        
+    def partition_events(self, events: List[SyncEvent], network: NetworkCondition,
+                         quality_score: Optional[float] = None):
         """
-        Calculate optimal delay before sync attempt
-        TODO: Add predictive modeling
+        Vectorized should_sync_now over a batch of events
+        Returns (batches_to_sync, events_to_delay), with sync-now events
+        grouped as in batch_similar_events, all in a single pass
         """
-        base_delay = 2.0
+        n = len(events)
+        priorities = np.fromiter((e.priority for e in events), dtype=np.int64, count=n)
+        strong = np.fromiter((e.consistency_level == "strong" for e in events),
+                             dtype=np.bool_, count=n)
         
-        # Adjust based on network conditions
-        quality_score = self._calculate_network_score(network)
-        quality_factor = (100 - quality_score) / 100.0
+        if quality_score is None:
+            quality_score = self._calculate_network_score(network)
+        bucket = self._network_bucket(quality_score)
+        sync_mask = self._lut[bucket, np.clip(priorities, 0, 10)] | strong
         
-        # Size-based delay
-        size_factor = min(event.data_size / (1024 * 1024), 5.0)  # Max 5x for 1MB+
+        return self._group_events(events, sync_mask.tolist())
         
-        # Priority override
-        priority_factor = (11 - event.priority) / 10.0
+    def _group_events(self, events: List[SyncEvent], sync_flags):
+        """
+        Split events on sync_flags, grouping the sync-now ones by
+        (app_type, consistency_level); returns (batches, events_to_delay)
+        """
+        batches = defaultdict(list)
+        events_to_delay = []
+        for event, sync in zip(events, sync_flags):
+            if sync:
+                batches[(event.app_type, event.consistency_level)].append(event)
+            else:
+                events_to_delay.append(event)
+                
+        return list(batches.values()), events_to_delay
         
-        delay = base_delay * quality_factor * size_factor * priority_factor
+    def calculate_sync_delay(self, event: SyncEvent, network: NetworkCondition,
+                             quality_score: Optional[float] = None) -> float:
+        """
+        Calculate optimal delay before sync attempt
+        Pass a precomputed quality_score to skip rescoring the network
+        TODO: Add predictive modeling
+        """
+        base_delay = 2.0
+        if quality_score is None:
+            quality_score = self._calculate_network_score(network)
         
-        return min(max(delay, self.min_sync_interval), self.max_sync_delay)
+        return _delay_kernel(event.data_size, event.priority, quality_score,
+                             base_delay, self.min_sync_interval, self.max_sync_delay)
         
     def _calculate_network_score(self, network: NetworkCondition) -> float:
         """Calculate network quality score (0-100)"""
-        latency_score = max(0, 100 - (network.latency_ms / 5))
-        bandwidth_score = min(100, network.bandwidth_mbps * 10)
-        loss_score = max(0, 100 - (network.packet_loss * 10))
-        
-        return (
-            latency_score * self.adaptive_weights['latency'] +
-            bandwidth_score * self.adaptive_weights['bandwidth'] +
-            loss_score * 0.3
-        )
+        return _score_kernel(network.latency_ms, network.bandwidth_mbps,
+                             network.packet_loss, self._w_lat, self._w_bw)
         
     def add_sync_event(self, event: SyncEvent):
-        """Add new sync event to queue"""
-        self.sync_queue.put((event.priority, time.time(), event))
-        print(f"Added sync event: {event.data_id} (priority: {event.priority})")
+        """
+        Add new sync event to queue
+        A pending event for the same data_id is coalesced into one entry
+        that keeps the newer data and the higher priority
+        """
+        event = self._shard_for(event.data_id).add(event)
+        log.debug("Added sync event: %s (priority: %d)", event.data_id, event.priority)
+        
+    def _shard_for(self, data_id: str) -> _Shard:
+        """Shard that owns a data_id"""
+        return self._workers[hash(data_id) % len(self._workers)]
         
+    def queue_size(self) -> int:
+        """Number of events waiting to be processed, across all shards"""
+        return sum(shard.size() for shard in self._workers)
+            
     def batch_similar_events(self, events: List[SyncEvent]) -> List[List[SyncEvent]]:
         """
         Group similar events for batch processing
@@ -142,39 +364,64 @@ class AdaptiveSyncScheduler:
             return [events]
             
         # Simple batching by app type for now
-        batches = {}
-        for event in events:
-            key = f"{event.app_type}_{event.consistency_level}"
-            if key not in batches:
-                batches[key] = []
-            batches[key].append(event)
-            
-        return list(batches.values())
+        return self._group_events(events, repeat(True))[0]
         
     def execute_sync(self, event: SyncEvent, network: NetworkCondition) -> SyncResult:
         """
-        Execute sync operation
+        Execute sync operation, blocking until it completes
+        Runs on the scheduler's event loop while it is started
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass  # Not on an event loop thread, safe to block
+        else:
+            raise RuntimeError("execute_sync would block a running event loop; "
+                               "await _execute_sync_async instead")
+            
+        coro = self._execute_sync_async(event, network)
+        if self._loop is not None and self._loop.is_running():
+            return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+        return asyncio.run(coro)
+        
+    async def _execute_sync_async(self, event: SyncEvent, network: NetworkCondition,
+                                  inv_bw: Optional[float] = None,
+                                  latency_s: Optional[float] = None) -> SyncResult:
+        """
+        Execute sync operation as a coroutine on the event loop
+        inv_bw (seconds per byte) and latency_s can be precomputed once
+        per batch; they are derived from network when omitted
         TODO: Add real sync implementation with conflict resolution
         """
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
         
         if self.sync_callback:
-            return self.sync_callback(event, network)
+            if inspect.iscoroutinefunction(self.sync_callback):
+                return await self.sync_callback(event, network)
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, self.sync_callback, event, network)
+            if inspect.isawaitable(result):
+                result = await result  # e.g. a lambda or partial wrapping a coroutine
+            return result
             
         # Default simulation
-        print(f"[{self.node_id}] Syncing {event.data_id} "
-              f"(size: {event.data_size}B, priority: {event.priority})")
+        log.debug("[%s] Syncing %s (size: %dB, priority: %d)",
+                  self.node_id, event.data_id, event.data_size, event.priority)
         
+        if inv_bw is None:
+            inv_bw = 8.0 / (network.bandwidth_mbps * 1048576.0)
+        if latency_s is None:
+            latency_s = network.latency_ms * 1e-3
+            
         # Simulate network transfer time
-        transfer_time = event.data_size / (network.bandwidth_mbps * 1024 * 1024 / 8)
-        simulated_time = min(transfer_time + (network.latency_ms / 1000), 5.0)
+        simulated_time = min(event.data_size * inv_bw + latency_s, 5.0)
         
-        time.sleep(simulated_time)
+        await asyncio.sleep(simulated_time)
         
         # Simulate occasional failures
         success = network.packet_loss < 5.0 and network.latency_ms < 1000
         
-        sync_duration = time.time() - start_time
+        sync_duration = (time.monotonic_ns() - start_ns) / _NS_PER_S
         
         result = SyncResult(
             event=event,
@@ -184,74 +431,116 @@ class AdaptiveSyncScheduler:
             error_msg=None if success else "Network timeout"
         )
         
-        self.sync_history.append(result)
+        self._record_result(result)
         return result
         
-    def process_sync_queue(self):
-        """Main sync processing loop"""
+    def _record_result(self, result: SyncResult):
+        """
+        Append to sync history, keeping the running totals in step
+        Only called on the event loop thread, so shards never race here
+        """
+        if len(self.sync_history) == self.sync_history.maxlen:
+            evicted = self.sync_history[0]
+            self._success_count -= evicted.success
+            self._duration_sum -= evicted.sync_duration
+            self._priority_sum -= evicted.event.priority
+            
+        self.sync_history.append(result)
+        self._success_count += result.success
+        self._duration_sum += result.sync_duration
+        self._priority_sum += result.event.priority
+        
+    def process_sync_queue(self, shard: _Shard):
+        """Main sync processing loop for one shard"""
+        # Events drained from the shard but not yet synced or delayed
         pending_events = []
-        last_sync_time = 0
         
         while self.running:
             try:
                 # Collect events from queue
-                current_time = time.time()
+                now_ns = time.monotonic_ns()
                 
-                while not self.sync_queue.empty() and len(pending_events) < self.batch_threshold:
-                    try:
-                        priority, queued_time, event = self.sync_queue.get_nowait()
-                        pending_events.append(event)
-                    except:
-                        break
+                # Clear before draining so an add racing with the drain still wakes us
+                shard.wakeup.clear()
+                shard.release_delayed(now_ns)
+                pending_events = shard.drain_batch(self.batch_threshold)
                         
                 if not pending_events:
-                    time.sleep(0.1)
+                    # Wait for a new event or until the next delayed event is due
+                    timeout = 60.0
+                    ready_ns = shard.next_ready_ns()
+                    if ready_ns is not None:
+                        timeout = min(max(ready_ns - now_ns, 0) / _NS_PER_S, timeout)
+                    shard.wakeup.wait(timeout)
                     continue
                     
                 # Get current network conditions
-                network = self.network_monitor.get_current_conditions()
+                network = self.network_monitor.get_cached_conditions(max_age=self.network_cache_ttl)
+                quality_score = self._calculate_network_score(network)
                 
-                # Process events
-                events_to_sync = []
-                events_to_delay = []
+                # Per-batch transfer constants for _execute_sync_async
+                inv_bw = 8.0 / (network.bandwidth_mbps * 1048576.0)
+                latency_s = network.latency_ms * 1e-3
                 
-                for event in pending_events:
-                    if self.should_sync_now(event, network):
-                        events_to_sync.append(event)
-                    else:
-                        events_to_delay.append(event)
+                # Split into similar-event batches to sync now and events to delay
+                batches, events_to_delay = self.partition_events(
+                    pending_events, network, quality_score
+                )
                         
                 # Execute syncs
-                if events_to_sync:
+                if batches:
                     # Respect minimum sync interval
-                    if current_time - last_sync_time < self.min_sync_interval:
-                        time.sleep(self.min_sync_interval - (current_time - last_sync_time))
-                        
-                    # Batch similar events
-                    batches = self.batch_similar_events(events_to_sync)
+                    self._claim_sync_slot()
                     
                     for batch in batches:
-                        for event in batch:
-                            result = self.execute_sync(event, network)
+                        # Overlap the network waits of every sync in the batch
+                        results = asyncio.run_coroutine_threadsafe(
+                            self._execute_batch(batch, network, inv_bw, latency_s), self._loop
+                        ).result()
+                        
+                        for event, result in zip(batch, results):
+                            pending_events.remove(event)
                             if not result.success:
-                                print(f"Sync failed for {event.data_id}: {result.error_msg}")
+                                log.warning("Sync failed for %s: %s", event.data_id, result.error_msg)
                                 
-                    last_sync_time = time.time()
+                    with self._sync_gate:
+                        self._last_sync_ns = max(self._last_sync_ns, time.monotonic_ns())
                     
                 # Re-queue delayed events
                 for event in events_to_delay:
-                    delay = self.calculate_sync_delay(event, network)
-                    threading.Timer(delay, self._requeue_event, args=[event]).start()
+                    delay = self.calculate_sync_delay(event, network, quality_score)
+                    shard.delay(event, time.monotonic_ns() + int(delay * _NS_PER_S))
+                pending_events = []
                     
-                pending_events.clear()
+            except Exception:
+                log.exception("Error in sync processing")
                 
-            except Exception as e:
-                print(f"Error in sync processing: {e}")
+                # Put unfinished events back so they are retried
+                for event in pending_events:
+                    self.add_sync_event(event)
+                pending_events = []
                 time.sleep(1)
                 
-    def _requeue_event(self, event: SyncEvent):
-        """Re-queue a delayed event"""
-        self.add_sync_event(event)
+    def _claim_sync_slot(self):
+        """
+        Sleep until min_sync_interval has passed since the last sync on any
+        shard, reserving that start time so other shards queue up behind it
+        """
+        min_interval_ns = int(self.min_sync_interval * _NS_PER_S)
+        with self._sync_gate:
+            now_ns = time.monotonic_ns()
+            start_ns = max(now_ns, self._last_sync_ns + min_interval_ns)
+            self._last_sync_ns = start_ns
+            
+        if start_ns > now_ns:
+            time.sleep((start_ns - now_ns) / _NS_PER_S)
+            
+    async def _execute_batch(self, batch: List[SyncEvent], network: NetworkCondition,
+                             inv_bw: float, latency_s: float) -> List[SyncResult]:
+        """Run all syncs in a batch concurrently"""
+        return await asyncio.gather(*(
+            self._execute_sync_async(event, network, inv_bw, latency_s) for event in batch
+        ))
         
     def start(self):
         """Start the sync scheduler"""
@@ -260,39 +549,52 @@ class AdaptiveSyncScheduler:
             
         self.running = True
         self.network_monitor.start_monitoring()
-        self.sync_thread = threading.Thread(target=self.process_sync_queue)
-        self.sync_thread.daemon = True
-        self.sync_thread.start()
-        print(f"EdgeSync scheduler started for node: {self.node_id}")
+        
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever)
+        self._loop_thread.daemon = True
+        self._loop_thread.start()
+        
+        for shard in self._workers:
+            shard.thread = threading.Thread(target=self.process_sync_queue, args=(shard,))
+            shard.thread.daemon = True
+            shard.thread.start()
+        log.info("EdgeSync scheduler started for node: %s (%d shards)",
+                 self.node_id, len(self._workers))
         
     def stop(self):
         """Stop the sync scheduler"""
         self.running = False
+        for shard in self._workers:
+            shard.wakeup.set()
+            
+        # Shards may still be probing, so join them before the monitor shuts its pool
+        for shard in self._workers:
+            if shard.thread:
+                shard.thread.join(timeout=5)
+                
         self.network_monitor.stop_monitoring()
         
-        if self.sync_thread:
-            self.sync_thread.join(timeout=5)
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5)
+            self._loop.close()
+            self._loop = self._loop_thread = None
             
-        print(f"EdgeSync scheduler stopped for node: {self.node_id}")
+        log.info("EdgeSync scheduler stopped for node: %s", self.node_id)
         
     def get_performance_stats(self) -> Dict:
         """Get scheduler performance statistics"""
-        if not self.sync_history:
+        total_syncs = len(self.sync_history)
+        if not total_syncs:
             return {"total_syncs": 0}
             
-        recent_history = self.sync_history[-self.success_rate_window:]
-        
-        total_syncs = len(recent_history)
-        successful_syncs = sum(1 for r in recent_history if r.success)
-        avg_duration = sum(r.sync_duration for r in recent_history) / total_syncs
-        avg_priority = sum(r.event.priority for r in recent_history) / total_syncs
-        
         return {
             "total_syncs": total_syncs,
-            "success_rate": successful_syncs / total_syncs,
-            "avg_sync_duration": avg_duration,
-            "avg_priority": avg_priority,
-            "queue_size": self.sync_queue.qsize()
+            "success_rate": self._success_count / total_syncs,
+            "avg_sync_duration": self._duration_sum / total_syncs,
+            "avg_priority": self._priority_sum / total_syncs,
+            "queue_size": self.queue_size()
         }
         
     def adjust_adaptive_weights(self, performance_feedback: Dict):
@@ -304,20 +606,24 @@ class AdaptiveSyncScheduler:
         
         if success_rate < 0.7:  # Poor performance
             # Be more conservative
-            self.adaptive_weights['latency'] += 0.05
-            self.adaptive_weights['bandwidth'] += 0.05
+            self.adaptive_weights[self.W_LAT] += 0.05
+            self.adaptive_weights[self.W_BW] += 0.05
         elif success_rate > 0.9:  # Great performance
             # Be more aggressive
-            self.adaptive_weights['priority'] += 0.05
+            self.adaptive_weights[self.W_PRIO] += 0.05
             
         # Normalize weights
-        total_weight = sum(self.adaptive_weights.values())
+        total_weight = self.adaptive_weights.sum()
         if total_weight > 0:
-            for key in self.adaptive_weights:
-                self.adaptive_weights[key] /= total_weight
+            self.adaptive_weights /= total_weight
+                
+        self._sync_weight_cache()
 
 if __name__ == "__main__":
     # Basic testing
+    logging.basicConfig(format="%(message)s")
+    log.setLevel(logging.DEBUG)
+    
     scheduler = AdaptiveSyncScheduler("test_node")
     
     # Add some test events
@@ -5,9 +5,25 @@ TODO: Add CloudLab-specific network topology configs
 """
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, fields
+from functools import cached_property
 from typing import Dict, List
 
+try:
+    import orjson
+    
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        
+    _loads = orjson.loads
+except ImportError:  # Fall back to stdlib json
+    import json
+    
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+        
+    _loads = json.loads
+
 @dataclass
 class NetworkConfig:
     """Network monitoring configuration"""
@@ -78,6 +94,9 @@ class ExperimentConfig:
 class EdgeSyncConfig:
     """Main configuration class"""
     
+    # Config sections, in file order
+    SECTIONS = ('network', 'sync', 'cloudlab', 'experiment')
+    
     def __init__(self, config_file: str = None):
         self.network = NetworkConfig()
         self.sync = SyncConfig()
@@ -90,21 +109,18 @@ class EdgeSyncConfig:
             
     def load_from_file(self, config_file: str):
         """Load configuration from JSON file"""
-        import json
         try:
-            with open(config_file, 'r') as f:
-                config_data = json.load(f)
+            with open(config_file, 'rb') as f:
+                config_data = _loads(f.read())
                 
             # Update configurations
-            if 'network' in config_data:
-                for key, value in config_data['network'].items():
-                    if hasattr(self.network, key):
-                        setattr(self.network, key, value)
-                        
-            if 'sync' in config_data:
-                for key, value in config_data['sync'].items():
-                    if hasattr(self.sync, key):
-                        setattr(self.sync, key, value)
+            for name in self.SECTIONS:
+                section = getattr(self, name)
+                known = {f.name for f in fields(section)}
+                for key, value in config_data.get(name, {}).items():
+                    if key in known:
+                        setattr(section, key, value)
+            self.refresh()
                         
             print(f"Loaded configuration from {config_file}")
             
@@ -113,46 +129,28 @@ class EdgeSyncConfig:
             
     def save_to_file(self, config_file: str):
         """Save current configuration to JSON file"""
-        import json
-        
-        config_data = {
-            'network': {
-                'default_target_host': self.network.default_target_host,
-                'monitor_interval': self.network.monitor_interval,
-                'ping_samples': self.network.ping_samples,
-                'bandwidth_test_size': self.network.bandwidth_test_size,
-                'max_history_samples': self.network.max_history_samples
-            },
-            'sync': {
-                'min_sync_interval': self.sync.min_sync_interval,
-                'max_sync_delay': self.sync.max_sync_delay,
-                'batch_threshold': self.sync.batch_threshold,
-                'success_rate_window': self.sync.success_rate_window,
-                'priority_thresholds': self.sync.priority_thresholds
-            },
-            'cloudlab': {
-                'sites': self.cloudlab.sites,
-                'node_types': self.cloudlab.node_types
-            },
-            'experiment': {
-                'experiment_duration': self.experiment.experiment_duration,
-                'data_collection_interval': self.experiment.data_collection_interval,
-                'log_level': self.experiment.log_level,
-                'results_dir': self.experiment.results_dir,
-                'workload_types': self.experiment.workload_types
-            }
-        }
+        config_data = {name: asdict(getattr(self, name)) for name in self.SECTIONS}
         
         try:
-            with open(config_file, 'w') as f:
-                json.dump(config_data, f, indent=2)
+            with open(config_file, 'wb') as f:
+                f.write(_dumps(config_data))
             print(f"Configuration saved to {config_file}")
         except Exception as e:
             print(f"Error saving config file: {e}")
             
+    def refresh(self):
+        """Drop cached derived values so they are rebuilt from current settings"""
+        self.__dict__.pop('cloudlab_profile', None)
+        
     def get_cloudlab_profile(self):
+        """Get CloudLab profile configuration"""
+        return self.cloudlab_profile
+        
+    @cached_property
+    def cloudlab_profile(self):
         """
         Generate CloudLab profile configuration
+        Cached after first use; call refresh() after changing cloudlab settings
         TODO: Create actual geni-lib profile
         """
         profile_template = {
@@ -221,5 +219,4 @@ if __name__ == "__main__":
     
     # Show CloudLab profile
     print("\nCloudLab Profile Template:")
-    import json
-    print(json.dumps(config.get_cloudlab_profile(), indent=2))
+    print(_dumps(config.get_cloudlab_profile()).decode())
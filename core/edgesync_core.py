@@ -5,17 +5,53 @@ Early prototype for adaptive edge-cloud data sync
 """
 
 import time
+import heapq
+import itertools
 import threading
 import json
-import hashlib
 import subprocess
-import statistics
+from collections import deque
 from dataclasses import dataclass, asdict
 from typing import Dict, List, Optional, Any
-from queue import Queue
+from queue import Queue, Empty
+import numpy as np
 import requests
 
-@dataclass
+try:
+    import msgspec
+except ImportError:  # Fall back to stdlib json for history export
+    msgspec = None
+
+try:
+    from numba import njit
+except ImportError:  # Run decide_batch as plain numpy
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+def _mean(values):
+    """Arithmetic mean of a non-empty sequence of floats"""
+    return sum(values) / len(values)
+
+@njit(cache=True)
+def decide_batch(priorities, decisions, latency_ms, bandwidth_mbps):
+    """
+    Vectorized sync decision for a batch of event priorities
+    decisions is the (11, 2) decision table row for the current network
+    regime; returns (should_sync mask, delays in seconds)
+    """
+    rows = np.clip(priorities, 0, 10)
+    should_sync = decisions[rows, 0] > 0
+    
+    latency_factor = min(latency_ms / 100.0, 5.0)
+    bandwidth_factor = max(5.0 / bandwidth_mbps, 1.0)
+    delays = np.minimum(latency_factor * bandwidth_factor * decisions[rows, 1], 60.0)
+    
+    return should_sync, delays
+
+# Network regimes, used as the first index of the scheduler decision table
+HIGH_LATENCY, LOW_BANDWIDTH, GOOD_NETWORK = range(3)
+
+@dataclass(slots=True, frozen=True)
 class NetworkCondition:
     """Current network state"""
     latency_ms: float
@@ -24,7 +60,7 @@ class NetworkCondition:
     jitter_ms: float
     timestamp: float
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SyncEvent:
     """Represents a data synchronization event"""
     data_id: str
@@ -39,11 +75,16 @@ class NetworkMonitor:
     TODO: Add more sophisticated measurement techniques
     """
     
-    def __init__(self, target_host="8.8.8.8"):
+    def __init__(self, target_host="8.8.8.8", monitor_interval=5.0):
         self.target_host = target_host
+        self.monitor_interval = monitor_interval
         self.conditions = []
         self.monitoring = False
         
+        # Most recent measurement, reused by get_cached_conditions
+        self._last_cond = None
+        self._last_cond_ts = 0.0
+        
     def measure_latency(self, samples=5):
         """Measure round-trip latency"""
         latencies = []
@@ -65,7 +106,7 @@ class NetworkMonitor:
             except (subprocess.TimeoutExpired, subprocess.CalledProcessError, ValueError):
                 continue
                 
-        return statistics.mean(latencies) if latencies else 999.9
+        return _mean(latencies) if latencies else 999.9
         
     def estimate_bandwidth(self):
         """
@@ -94,13 +135,31 @@ class NetworkMonitor:
         latency = self.measure_latency()
         bandwidth = self.estimate_bandwidth()
         
-        return NetworkCondition(
+        condition = NetworkCondition(
             latency_ms=latency,
             bandwidth_mbps=bandwidth,
             packet_loss=0.0,  # TODO: implement packet loss detection
             jitter_ms=0.0,    # TODO: implement jitter measurement
             timestamp=time.time()
         )
+        
+        self._last_cond = condition
+        self._last_cond_ts = condition.timestamp
+        
+        return condition
+        
+    def get_cached_conditions(self, max_age=None):
+        """
+        Get network conditions, reusing the last measurement if it is
+        younger than max_age seconds (defaults to monitor_interval)
+        """
+        if max_age is None:
+            max_age = self.monitor_interval
+            
+        if self._last_cond is not None and time.time() - self._last_cond_ts < max_age:
+            return self._last_cond
+            
+        return self.get_current_conditions()
 
 class AdaptiveSyncScheduler:
     """
@@ -111,27 +170,60 @@ class AdaptiveSyncScheduler:
     def __init__(self):
         self.sync_queue = Queue()
         self.network_monitor = NetworkMonitor()
-        self.sync_history = []
+        self.max_history = 10000  # Keep last 10000 syncs
+        self.sync_history = deque(maxlen=self.max_history)
         self.running = False
+        self.batch_threshold = 5  # Max events drained per loop iteration
+        self._decision = self._build_decision_table()
+        
+        # Delayed events as a (ready_at, seq, event) heap, drained by _delay_loop;
+        # ready_at is on the monotonic clock
+        self._delayed = []
+        self._delay_cv = threading.Condition()
+        self._seq = itertools.count()
+        
+    def _build_decision_table(self) -> np.ndarray:
+        """
+        Precompute (should_sync, delay_multiplier) for every
+        (network regime, priority) pair, priorities clamped to 0-10
+        """
+        # Minimum priority that syncs immediately in each regime
+        min_priority = {
+            HIGH_LATENCY: 6,    # High latency - be conservative
+            LOW_BANDWIDTH: 7,   # Low bandwidth - only important stuff
+            GOOD_NETWORK: 4     # Good network conditions - sync more freely
+        }
+        
+        table = np.zeros((3, 11, 2))
+        for regime, threshold in min_priority.items():
+            for priority in range(11):
+                # High priority always syncs
+                table[regime, priority, 0] = priority >= 8 or priority >= threshold
+                
+                if priority >= 8:
+                    table[regime, priority, 1] = 0.1  # High priority gets fast sync
+                elif priority <= 3:
+                    table[regime, priority, 1] = 3.0  # Low priority can wait
+                else:
+                    table[regime, priority, 1] = 1.0
+                    
+        return table
+        
+    def _classify_network(self, network: NetworkCondition) -> int:
+        """Map network conditions onto a decision table regime"""
+        if network.latency_ms > 500:
+            return HIGH_LATENCY
+        if network.bandwidth_mbps < 1.0:
+            return LOW_BANDWIDTH
+        return GOOD_NETWORK
         
     def should_sync_now(self, event: SyncEvent, network: NetworkCondition) -> bool:
         """
         Core algorithm: decide if we should sync now
         TODO: Make this much smarter with ML predictions
         """
-        
-        # Simple heuristic for now - will expand this
-        if event.priority >= 8:  # High priority always syncs
-            return True
-            
-        if network.latency_ms > 500:  # High latency - be conservative
-            return event.priority >= 6
-            
-        if network.bandwidth_mbps < 1.0:  # Low bandwidth - only important stuff
-            return event.priority >= 7
-            
-        # Good network conditions - sync more freely
-        return event.priority >= 4
+        priority = min(max(event.priority, 0), 10)
+        return bool(self._decision[self._classify_network(network), priority, 0])
         
     def calculate_sync_delay(self, event: SyncEvent, network: NetworkCondition) -> float:
         """
@@ -144,14 +236,12 @@ class AdaptiveSyncScheduler:
         latency_factor = min(network.latency_ms / 100.0, 5.0)
         bandwidth_factor = max(5.0 / network.bandwidth_mbps, 1.0)
         
-        delay = base_delay * latency_factor * bandwidth_factor
-        
         # Priority override
-        if event.priority >= 8:
-            delay *= 0.1  # High priority gets fast sync
-        elif event.priority <= 3:
-            delay *= 3.0  # Low priority can wait
-            
+        priority = min(max(event.priority, 0), 10)
+        priority_factor = float(self._decision[self._classify_network(network), priority, 1])
+        
+        delay = base_delay * latency_factor * bandwidth_factor * priority_factor
+        
         return min(delay, 60.0)  # Cap at 1 minute
         
     def add_sync_event(self, event: SyncEvent):
@@ -161,30 +251,76 @@ class AdaptiveSyncScheduler:
     def process_sync_queue(self):
         """
         Main sync processing loop
-        TODO: Add batch processing for efficiency
+        Drains up to batch_threshold events per iteration and decides
+        them against a single network measurement
         """
         while self.running:
             try:
-                if not self.sync_queue.empty():
-                    event = self.sync_queue.get(timeout=1)
-                    network = self.network_monitor.get_current_conditions()
-                    
-                    if self.should_sync_now(event, network):
-                        self.execute_sync(event, network)
-                    else:
-                        # Calculate delay and re-queue
-                        delay = self.calculate_sync_delay(event, network)
+                event = self.sync_queue.get(timeout=1.0)
+            except Empty:
+                continue
+                
+            if event is None:  # Wake-up from stop(); self.running decides whether to exit
+                continue
+                
+            batch = [event]
+            while len(batch) < self.batch_threshold:
+                try:
+                    event = self.sync_queue.get_nowait()
+                except Empty:
+                    break
+                if event is not None:  # Skip stop() wake-ups
+                    batch.append(event)
+                
+            try:
+                network = self.network_monitor.get_cached_conditions(
+                    max_age=self.network_monitor.monitor_interval
+                )
+                
+                priorities = np.fromiter((e.priority for e in batch), dtype=np.int64, count=len(batch))
+                should_sync, delays = decide_batch(
+                    priorities,
+                    self._decision[self._classify_network(network)],
+                    network.latency_ms,
+                    network.bandwidth_mbps
+                )
+                
+                self.execute_sync_batch(
+                    [e for e, sync in zip(batch, should_sync) if sync], network
+                )
+                
+                for event, sync, delay in zip(batch, should_sync, delays.tolist()):
+                    if not sync:
+                        # Re-queue after the calculated delay
                         print(f"Delaying sync for {event.data_id} by {delay:.1f}s")
-                        
-                        # In real implementation, would use proper scheduler
-                        threading.Timer(delay, lambda: self.sync_queue.put(event)).start()
-                        
-                else:
-                    time.sleep(0.1)
+                        self._schedule_delayed(event, delay)
                     
             except Exception as e:
                 print(f"Error in sync processing: {e}")
                 
+    def _schedule_delayed(self, event: SyncEvent, delay: float):
+        """Re-queue an event after delay seconds"""
+        with self._delay_cv:
+            heapq.heappush(self._delayed, (time.monotonic() + delay, next(self._seq), event))
+            self._delay_cv.notify()
+            
+    def _delay_loop(self):
+        """Move delayed events back onto the sync queue once they are due"""
+        with self._delay_cv:
+            while self.running:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    _, _, event = heapq.heappop(self._delayed)
+                    self.sync_queue.put(event)
+                    
+                timeout = self._delayed[0][0] - now if self._delayed else None
+                self._delay_cv.wait(timeout)
+                
+    def execute_sync_batch(self, events: List[SyncEvent], network: NetworkCondition):
+        """Execute a batch of syncs against one network measurement"""
+        for event in events:
+            self.execute_sync(event, network)
+            
     def execute_sync(self, event: SyncEvent, network: NetworkCondition):
         """
         Execute the actual sync operation
@@ -198,25 +334,29 @@ class AdaptiveSyncScheduler:
         sync_time = event.data_size / (network.bandwidth_mbps * 1024 * 1024) * 8
         time.sleep(min(sync_time, 0.1))  # Cap simulation time
         
-        # Record sync for analysis
-        self.sync_history.append({
-            'event': asdict(event),
-            'network': asdict(network),
-            'sync_timestamp': time.time()
-        })
+        # Record sync for analysis as (event, network, sync_timestamp)
+        self.sync_history.append((event, network, time.time()))
         
     def start(self):
         """Start the sync scheduler"""
         self.running = True
         self.sync_thread = threading.Thread(target=self.process_sync_queue)
         self.sync_thread.start()
+        self.delay_thread = threading.Thread(target=self._delay_loop)
+        self.delay_thread.start()
         print("EdgeSync scheduler started")
         
     def stop(self):
         """Stop the sync scheduler"""
         self.running = False
+        self.sync_queue.put(None)  # Wake the sync thread so it exits promptly
+        with self._delay_cv:
+            self._delay_cv.notify()  # Wake the delay thread as well
+            
         if hasattr(self, 'sync_thread'):
             self.sync_thread.join()
+        if hasattr(self, 'delay_thread'):
+            self.delay_thread.join()
         print("EdgeSync scheduler stopped")
         
     def get_stats(self):
@@ -224,15 +364,31 @@ class AdaptiveSyncScheduler:
         if not self.sync_history:
             return {}
             
-        latencies = [h['network']['latency_ms'] for h in self.sync_history]
-        priorities = [h['event']['priority'] for h in self.sync_history]
+        latencies = [h[1].latency_ms for h in self.sync_history]
+        priorities = [h[0].priority for h in self.sync_history]
         
         return {
             'total_syncs': len(self.sync_history),
-            'avg_latency': statistics.mean(latencies),
-            'avg_priority': statistics.mean(priorities),
-            'sync_rate': len(self.sync_history) / (time.time() - self.sync_history[0]['sync_timestamp'])
+            'avg_latency': _mean(latencies),
+            'avg_priority': _mean(priorities),
+            'sync_rate': len(self.sync_history) / (time.time() - self.sync_history[0][2])
         }
+        
+    def export_history_json(self) -> bytes:
+        """Serialize sync history to JSON for offline analysis"""
+        records = [
+            {'event': event, 'network': network, 'sync_timestamp': ts}
+            for event, network, ts in self.sync_history
+        ]
+        
+        if msgspec:
+            return msgspec.json.encode(records)
+            
+        return json.dumps([
+            {'event': asdict(r['event']), 'network': asdict(r['network']),
+             'sync_timestamp': r['sync_timestamp']}
+            for r in records
+        ]).encode()
 
 def demo_adaptive_sync():
     """
@@ -4,15 +4,36 @@ Network monitoring module for EdgeSync
 Tracks network conditions between edge and cloud nodes
 """
 
+import re
 import time
 import subprocess
-import statistics
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Optional
+import numpy as np
 import requests
 
-@dataclass
+try:
+    import icmplib
+except ImportError:  # Fall back to the system ping binary
+    icmplib = None
+
+# ping summary lines, e.g. "rtt min/avg/max/mdev = 9.8/12.3/15.1/1.9 ms"
+# (BusyBox prints "round-trip min/avg/max = 9.8/12.3/15.1 ms", without jitter)
+# and "10 packets transmitted, 9 received, 10% packet loss"
+_SUMMARY_RE = re.compile(
+    r'min/avg/max(?:/(?:mdev|stddev))? = [\d.]+/([\d.]+)/[\d.]+(?:/([\d.]+))?'
+)
+_LOSS_RE = re.compile(r'(\d+(?:\.\d+)?)% packet loss')
+
+# Column layout of the history ring buffer (matches NetworkCondition field order)
+_LATENCY, _BANDWIDTH, _LOSS, _JITTER, _TIMESTAMP = range(5)
+
+# Quality score weights for latency, bandwidth, packet loss and jitter
+_QUALITY_WEIGHTS = np.array([0.4, 0.3, 0.2, 0.1])
+
+@dataclass(slots=True, frozen=True)
 class NetworkCondition:
     """Current network state"""
     latency_ms: float
@@ -30,61 +51,118 @@ class NetworkMonitor:
     def __init__(self, target_host="8.8.8.8", monitor_interval=5.0):
         self.target_host = target_host
         self.monitor_interval = monitor_interval
-        self.conditions_history = []
+        self.max_monitor_interval = 60.0  # Back-off ceiling while the network is stable
+        self._current_interval = monitor_interval  # Probe interval the monitor loop is on
+        self.max_history = 100  # Keep last 100 measurements
         self.monitoring = False
         self.monitor_thread = None
-        self.max_history = 100  # Keep last 100 measurements
+        self._stop_event = threading.Event()
         
-    def measure_latency(self, samples=3):
-        """Measure round-trip latency using ping"""
-        latencies = []
+        # Ring buffer of [latency, bandwidth, loss, jitter, timestamp] rows;
+        # _history_lock covers the rows together with idx and count
+        self._history = np.zeros((self.max_history, 5), dtype=np.float64)
+        self._history_idx = 0
+        self._history_count = 0
+        self._history_lock = threading.Lock()
         
-        for _ in range(samples):
-            try:
-                result = subprocess.run([
-                    'ping', '-c', '1', '-W', '2', self.target_host
-                ], capture_output=True, text=True, timeout=5)
-                
-                if result.returncode == 0:
-                    # Parse ping output
-                    for line in result.stdout.split('\n'):
-                        if 'time=' in line:
-                            time_str = line.split('time=')[1].split()[0]
-                            latencies.append(float(time_str))
-                            break
-                            
-            except (subprocess.TimeoutExpired, subprocess.CalledProcessError, ValueError):
-                continue
+        # Persistent HTTP session so bandwidth probes reuse the TCP connection
+        self._session = requests.Session()
+        self._session.headers.update({
+            'User-Agent': 'EdgeSync-NetworkMonitor',
+            'Connection': 'keep-alive'
+        })
+        
+        # Probe with icmplib unless it is missing or lacks socket permissions
+        self._use_icmplib = icmplib is not None
+        
+        # Runs the HTTP bandwidth probe alongside ping; created on first use.
+        # Probes run one at a time under _probe_lock, which also guards the pool
+        self._pool = None
+        self._probe_lock = threading.Lock()
+        
+        # Most recent measurement and the monotonic time it completed,
+        # reused by get_cached_conditions
+        self._last_cond = None
+        self._last_cond_ts = 0.0
+        
+    @property
+    def conditions_history(self) -> List[NetworkCondition]:
+        """Recorded conditions, oldest first"""
+        with self._history_lock:
+            if self._history_count < self.max_history:
+                rows = self._history[:self._history_count].copy()
+            else:
+                rows = np.roll(self._history, -self._history_idx, axis=0)
                 
-        if not latencies:
-            return 999.9  # High latency indicates problems
-            
-        return statistics.mean(latencies)
+        return [NetworkCondition(*row.tolist()) for row in rows]
         
-    def measure_jitter(self, samples=5):
-        """Measure latency variation (jitter)"""
-        latencies = []
+    def _record_condition(self, condition: NetworkCondition):
+        """Write a measurement into the history ring buffer"""
+        with self._history_lock:
+            self._history[self._history_idx] = (
+                condition.latency_ms,
+                condition.bandwidth_mbps,
+                condition.packet_loss,
+                condition.jitter_ms,
+                condition.timestamp
+            )
+            self._history_idx = (self._history_idx + 1) % self.max_history
+            self._history_count = min(self._history_count + 1, self.max_history)
+            
+    def _latest_row(self) -> np.ndarray:
+        """Most recently recorded history row; the caller holds _history_lock"""
+        return self._history[(self._history_idx - 1) % self.max_history].copy()
         
-        for _ in range(samples):
+    def _probe_network(self, samples=10):
+        """
+        Measure latency, jitter and packet loss with a single ping run
+        Uses icmplib when available, otherwise the system ping binary
+        """
+        if self._use_icmplib:
             try:
-                result = subprocess.run([
-                    'ping', '-c', '1', '-W', '1', self.target_host
-                ], capture_output=True, text=True, timeout=2)
-                
-                if result.returncode == 0:
-                    for line in result.stdout.split('\n'):
-                        if 'time=' in line:
-                            time_str = line.split('time=')[1].split()[0]
-                            latencies.append(float(time_str))
-                            break
-                            
-            except (subprocess.TimeoutExpired, subprocess.CalledProcessError, ValueError):
-                continue
+                host = icmplib.ping(self.target_host, count=samples, interval=0.2,
+                                    timeout=2, privileged=False)
+            except icmplib.SocketPermissionError:
+                self._use_icmplib = False  # Unprivileged ICMP sockets not permitted here
+            except icmplib.ICMPLibError:
+                pass
+            else:
+                if not host.packets_received:
+                    return 999.9, 0.0, 100.0  # High latency indicates problems
+                return host.avg_rtt, host.jitter, host.packet_loss * 100
                 
-        if len(latencies) < 2:
-            return 0.0
+        return self._probe_network_subprocess(samples)
+        
+    def _probe_network_subprocess(self, samples):
+        """
+        Fallback probe that shells out to ping
+        Reads the rtt summary line (avg, and mdev where ping reports it)
+        and the packet loss line
+        """
+        try:
+            result = subprocess.run([
+                'ping', '-c', str(samples), '-i', '0.2', '-W', '2', self.target_host
+            ], capture_output=True, text=True, timeout=samples * 0.2 + 5)
+        except (subprocess.TimeoutExpired, subprocess.CalledProcessError):
+            return 999.9, 0.0, 0.0
             
-        return statistics.stdev(latencies)
+        # ping exits non-zero on partial loss, so parse regardless of exit code
+        summary = _SUMMARY_RE.search(result.stdout)
+        loss = _LOSS_RE.search(result.stdout)
+        
+        latency = float(summary.group(1)) if summary else 999.9  # High latency indicates problems
+        jitter = float(summary.group(2)) if summary and summary.group(2) else 0.0
+        packet_loss = float(loss.group(1)) if loss else 0.0
+        
+        return latency, jitter, packet_loss
+        
+    def measure_latency(self, samples=3):
+        """Measure round-trip latency using ping"""
+        return self._probe_network(samples)[0]
+        
+    def measure_jitter(self, samples=5):
+        """Measure latency variation (jitter)"""
+        return self._probe_network(samples)[1]
         
     def estimate_bandwidth(self):
         """
@@ -94,11 +172,7 @@ class NetworkMonitor:
         try:
             start_time = time.time()
             # Download small test file
-            response = requests.get(
-                'http://httpbin.org/bytes/8192', 
-                timeout=10,
-                headers={'User-Agent': 'EdgeSync-NetworkMonitor'}
-            )
+            response = self._session.get('http://httpbin.org/bytes/8192', timeout=10)
             end_time = time.time()
             
             if response.status_code == 200:
@@ -119,28 +193,23 @@ class NetworkMonitor:
         Measure packet loss percentage
         TODO: Implement more sophisticated loss detection
         """
-        try:
-            result = subprocess.run([
-                'ping', '-c', str(samples), '-W', '2', self.target_host
-            ], capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                for line in result.stdout.split('\n'):
-                    if 'packet loss' in line:
-                        loss_str = line.split('packet loss')[0].split()[-1]
-                        return float(loss_str.replace('%', ''))
-                        
-        except (subprocess.TimeoutExpired, subprocess.CalledProcessError, ValueError):
-            pass
-            
-        return 0.0
+        return self._probe_network(samples)[2]
         
     def get_current_conditions(self):
         """Get current network conditions"""
-        latency = self.measure_latency()
-        bandwidth = self.estimate_bandwidth()
-        jitter = self.measure_jitter()
-        packet_loss = self.measure_packet_loss()
+        with self._probe_lock:
+            return self._measure_conditions()
+            
+    def _measure_conditions(self):
+        """Probe the network and record the result; the caller holds _probe_lock"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='edgesync-probe')
+        pool = self._pool
+        
+        # Both probes are I/O bound, so run the HTTP download while ping is in flight
+        bandwidth_future = pool.submit(self.estimate_bandwidth)
+        latency, jitter, packet_loss = self._probe_network()
+        bandwidth = bandwidth_future.result()
         
         condition = NetworkCondition(
             latency_ms=latency,
@@ -150,32 +219,62 @@ class NetworkMonitor:
             timestamp=time.time()
         )
         
-        # Add to history
-        self.conditions_history.append(condition)
-        if len(self.conditions_history) > self.max_history:
-            self.conditions_history.pop(0)
+        # Add to history (overwrites the oldest entry once full)
+        self._record_condition(condition)
+        self._last_cond = condition
+        self._last_cond_ts = time.monotonic()
             
         return condition
         
+    def get_cached_conditions(self, max_age=None):
+        """
+        Get network conditions, reusing the last measurement if it is
+        younger than max_age seconds (defaults to the monitor loop's
+        current, possibly backed-off, probe interval)
+        Concurrent callers share a single in-flight probe
+        """
+        if max_age is None:
+            max_age = self._current_interval
+            
+        condition = self._fresh_condition(max_age)
+        if condition is not None:
+            return condition
+            
+        with self._probe_lock:
+            # Another caller may have probed while we waited for the lock
+            condition = self._fresh_condition(max_age)
+            if condition is not None:
+                return condition
+            return self._measure_conditions()
+            
+    def _fresh_condition(self, max_age):
+        """Last measurement if it is younger than max_age seconds, else None"""
+        condition, measured_at = self._last_cond, self._last_cond_ts
+        if condition is not None and time.monotonic() - measured_at < max_age:
+            return condition
+        return None
+        
     def get_average_conditions(self, window_minutes=5):
         """Get average conditions over a time window"""
-        if not self.conditions_history:
-            return None
-            
         cutoff_time = time.time() - (window_minutes * 60)
-        recent_conditions = [
-            c for c in self.conditions_history 
-            if c.timestamp >= cutoff_time
-        ]
         
-        if not recent_conditions:
-            return self.conditions_history[-1]  # Return most recent
+        with self._history_lock:
+            if not self._history_count:
+                return None
+                
+            rows = self._history[:self._history_count]
+            recent = rows[rows[:, _TIMESTAMP] >= cutoff_time]
             
+            if not len(recent):
+                return NetworkCondition(*self._latest_row().tolist())  # Return most recent
+                
+        latency, bandwidth, loss, jitter = recent[:, :_TIMESTAMP].mean(axis=0).tolist()
+        
         return NetworkCondition(
-            latency_ms=statistics.mean(c.latency_ms for c in recent_conditions),
-            bandwidth_mbps=statistics.mean(c.bandwidth_mbps for c in recent_conditions),
-            packet_loss=statistics.mean(c.packet_loss for c in recent_conditions),
-            jitter_ms=statistics.mean(c.jitter_ms for c in recent_conditions),
+            latency_ms=latency,
+            bandwidth_mbps=bandwidth,
+            packet_loss=loss,
+            jitter_ms=jitter,
             timestamp=time.time()
         )
         
@@ -185,6 +284,7 @@ class NetworkMonitor:
             return
             
         self.monitoring = True
+        self._stop_event.clear()
         self.monitor_thread = threading.Thread(target=self._monitor_loop)
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
@@ -193,49 +293,64 @@ class NetworkMonitor:
     def stop_monitoring(self):
         """Stop continuous monitoring"""
         self.monitoring = False
+        self._stop_event.set()  # Interrupt the current wait
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
+        self._current_interval = self.monitor_interval
+        with self._probe_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+        self._session.close()
         print("Stopped network monitoring")
         
     def _monitor_loop(self):
-        """Main monitoring loop"""
+        """
+        Main monitoring loop
+        Backs off the probe interval while the quality score is stable
+        and shrinks it back toward monitor_interval when it swings
+        """
+        interval = self.monitor_interval
+        last_score = None
+        
         while self.monitoring:
             try:
                 self.get_current_conditions()
-                time.sleep(self.monitor_interval)
+                score = self.get_network_quality_score()
+                
+                if last_score is not None and abs(score - last_score) < 5:
+                    interval = min(interval * 1.5, self.max_monitor_interval)
+                else:
+                    interval = max(self.monitor_interval, interval / 2)
+                last_score = score
             except Exception as e:
                 print(f"Network monitoring error: {e}")
-                time.sleep(self.monitor_interval)
+                
+            self._current_interval = interval
+            self._stop_event.wait(interval)
                 
     def get_network_quality_score(self):
         """
         Calculate a simple network quality score (0-100)
         Higher is better
         """
-        if not self.conditions_history:
-            return 50  # Unknown, assume average
-            
-        recent = self.conditions_history[-1]
-        
-        # Score based on latency (lower is better)
-        latency_score = max(0, 100 - (recent.latency_ms / 5))
-        
-        # Score based on bandwidth (higher is better)
-        bandwidth_score = min(100, recent.bandwidth_mbps * 10)
-        
-        # Score based on packet loss (lower is better)
-        loss_score = max(0, 100 - (recent.packet_loss * 10))
+        with self._history_lock:
+            if not self._history_count:
+                return 50  # Unknown, assume average
+                
+            latency, bandwidth, loss, jitter = self._latest_row()[:_TIMESTAMP]
         
-        # Score based on jitter (lower is better)
-        jitter_score = max(0, 100 - (recent.jitter_ms * 2))
+        # Per-metric scores: latency, loss and jitter are lower-is-better,
+        # bandwidth is higher-is-better
+        scores = np.clip([
+            100 - (latency / 5),
+            bandwidth * 10,
+            100 - (loss * 10),
+            100 - (jitter * 2)
+        ], 0, 100)
         
         # Weighted average
-        overall_score = (
-            latency_score * 0.4 +
-            bandwidth_score * 0.3 +
-            loss_score * 0.2 +
-            jitter_score * 0.1
-        )
+        overall_score = float(scores @ _QUALITY_WEIGHTS)
         
         return min(100, max(0, overall_score))
 